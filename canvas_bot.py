@@ -118,7 +118,7 @@ def render_canvas_yaml(yaml_content: str, output_name: str = None, theme: str =
             output_name = f"canvas_{timestamp}"
 
         output_path = DIAGRAMS_DIR / f"{output_name}.png"
-        renderer.render(canvas, output_path=str(output_path), organize=True)
+        renderer.render(canvas, output_path=str(output_path), organize=True, return_bytes=False)
 
         return str(output_path), None
     except Exception as e:
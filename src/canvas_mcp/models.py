@@ -302,6 +302,9 @@ class Canvas(BaseModel):
     The canvas maintains a ``_node_map`` for O(1) node lookup by id.
     Use ``get_node(id)`` for single lookups, ``all_nodes()`` for iteration,
     and ``all_connections()`` for the deduplicated edge list.
+    ``node_count()`` and ``connection_count()`` return sizes cached at
+    construction, so like ``_node_map`` they assume the node/connection
+    structure is not mutated afterwards (moving nodes is fine).
     """
     version: str = "2.0"
     title: str = "Untitled Canvas"
@@ -313,15 +316,34 @@ class Canvas(BaseModel):
 
     # Flat access helpers
     _node_map: dict[str, CanvasNode] = {}
+    _node_count: int = 0
+    _connection_count: int = 0
 
     def model_post_init(self, __context):
         """Build lookup maps after initialization."""
         self._node_map = {}
+        node_count = 0
+        edges = set()
         for network in self.networks:
             for factory in network.factories:
                 for machine in factory.machines:
                     for node in machine.nodes:
                         self._node_map[node.id] = node
+                        node_count += 1
+                        for input_id in node.inputs:
+                            edges.add((input_id, node.id))
+                        for output_id in node.outputs:
+                            edges.add((node.id, output_id))
+        self._node_count = node_count
+        self._connection_count = len(edges)
+
+    def node_count(self) -> int:
+        """Number of nodes, equal to ``len(all_nodes())``."""
+        return self._node_count
+
+    def connection_count(self) -> int:
+        """Number of connections, equal to ``len(all_connections())``."""
+        return self._connection_count
 
     def get_node(self, node_id: str) -> Optional[CanvasNode]:
         """Look up a node by its globally unique id."""
@@ -30,6 +30,7 @@ Spacing constants:
 from __future__ import annotations
 
 import math
+from collections import deque
 from dataclasses import dataclass, field
 from typing import Optional
 
@@ -56,7 +57,7 @@ GRID_COLUMNS_NODE = 4
 GRID_COLUMNS_CONTAINER = 3
 
 
-@dataclass
+@dataclass(slots=True)
 class OrganizeItem:
     """An item to be organized (node or container)."""
     id: str
@@ -68,14 +69,14 @@ class OrganizeItem:
     node_ids: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class OrganizeEdge:
     """A directed edge between organize items."""
     from_id: str
     to_id: str
 
 
-@dataclass
+@dataclass(slots=True)
 class OrganizeOptions:
     """Layout options for the organize algorithm."""
     orientation: str = "horizontal"  # 'horizontal' or 'vertical'
@@ -88,14 +89,14 @@ class OrganizeOptions:
     grid_columns: int = GRID_COLUMNS_NODE
 
 
-@dataclass
+@dataclass(slots=True)
 class LayoutPosition:
     """Computed position for an item."""
     x: float
     y: float
 
 
-@dataclass
+@dataclass(slots=True)
 class ContainerBounds:
     """Bounding box for a container, computed from its children."""
     x: float
@@ -134,14 +135,19 @@ def compute_organized_layout(
     adjacency: dict[str, list[str]] = {item.id: [] for item in items}
     indegree: dict[str, int] = {item.id: 0 for item in items}
 
+    # Sources of every edge into each target, in edge order, for the
+    # parent lookups in steps 3 and 6
+    incoming: dict[str, list[str]] = {}
+
     for edge in edges:
         if edge.from_id in adjacency and edge.to_id in indegree:
             adjacency[edge.from_id].append(edge.to_id)
             indegree[edge.to_id] = indegree.get(edge.to_id, 0) + 1
+        incoming.setdefault(edge.to_id, []).append(edge.from_id)
 
     # --- Step 2: Kahn's topological sort ---
     levels: dict[str, int] = {}
-    queue: list[str] = []
+    queue: deque[str] = deque()
 
     # Sources sorted by position (top-left first)
     sorted_items = sorted(items, key=lambda it: (it.x, it.y))
@@ -151,7 +157,7 @@ def compute_organized_layout(
             queue.append(item.id)
 
     while queue:
-        current = queue.pop(0)
+        current = queue.popleft()
         current_level = levels.get(current, 0)
         for target in adjacency.get(current, []):
             candidate = current_level + 1
@@ -169,9 +175,9 @@ def compute_organized_layout(
         unresolved.sort(key=lambda it: (it.y, it.x))
         for item in unresolved:
             incoming_levels = [
-                levels[e.from_id]
-                for e in edges
-                if e.to_id == item.id and e.from_id in levels
+                levels[from_id]
+                for from_id in incoming.get(item.id, ())
+                if from_id in levels
             ]
             if incoming_levels:
                 levels[item.id] = max(incoming_levels) + 1
@@ -237,10 +243,10 @@ def compute_organized_layout(
 
         def get_parent_centers(item_id: str) -> list[float]:
             centers = []
-            for edge in edges:
-                if edge.to_id == item_id and edge.from_id in layout:
-                    parent_item = item_map.get(edge.from_id)
-                    parent_pos = layout.get(edge.from_id)
+            for from_id in incoming.get(item_id, ()):
+                if from_id in layout:
+                    parent_item = item_map.get(from_id)
+                    parent_pos = layout.get(from_id)
                     if parent_item and parent_pos:
                         centers.append(parent_pos.y + parent_item.height / 2)
             return centers
@@ -716,7 +722,7 @@ NODE_BBOX_MARGIN = -8
 MAX_NUDGE_DISPLACEMENT = 400
 
 
-@dataclass
+@dataclass(slots=True)
 class _BezierSegment:
     """A sampled point on a bezier connector path."""
     x: float
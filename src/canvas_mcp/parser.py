@@ -6,9 +6,12 @@ Supports two formats:
 """
 
 from __future__ import annotations
-from pathlib import Path
-
-import yaml
+import copy
+import mmap
+import os
+from functools import lru_cache
+from itertools import islice
+from typing import IO
 
 from .models import (
     Canvas,
@@ -21,9 +24,153 @@ from .models import (
 )
 
 
+# --- YAML backend ---
+# PyYAML is imported on first use so that importing this module (and the
+# server, which imports it) does not pay for it up front.
+
+@lru_cache(maxsize=None)
+def _yaml():
+    """Import PyYAML and return ``(yaml, Loader, Dumper)``.
+
+    Prefers the libyaml-backed loader and dumper (several times faster);
+    falls back to the pure-Python ones when PyYAML was built without
+    libyaml.
+    """
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    return yaml, loader, dumper
+
+
+def _load(stream):
+    """Load a YAML document from a string, bytes or binary stream."""
+    yaml, loader, _ = _yaml()
+    return yaml.load(stream, Loader=loader)
+
+
+def _dump(data, stream=None):
+    """Dump ``data`` as block-style YAML, keeping key order."""
+    yaml, _, dumper = _yaml()
+    return yaml.dump(
+        data, stream, Dumper=dumper, default_flow_style=False, sort_keys=False,
+    )
+
+
 def parse_yaml(yaml_str: str) -> Canvas:
     """Parse a YAML string into a Canvas model."""
-    data = yaml.safe_load(yaml_str)
+    return parse_dict(_load(yaml_str))
+
+
+def parse_file(path: str) -> Canvas:
+    """Parse a YAML file into a Canvas model.
+
+    Parsed files are cached by resolved path, modification time and size,
+    so an unchanged file is only parsed once.  Rendering moves nodes in
+    place, so every call returns its own deep copy of the cached canvas.
+    """
+    # Resolve the path so a relative name can't hit another file's entry
+    # after a chdir
+    path = os.path.realpath(path)
+    st = os.stat(path)
+    return copy.deepcopy(_parse_file_cached(path, st.st_mtime_ns, st.st_size))
+
+
+@lru_cache(maxsize=32)
+def _parse_file_cached(path: str, mtime_ns: int, size: int) -> Canvas:
+    """Parse ``path``; the stat fields only serve as cache key."""
+    # The loader reads straight from a read-only mapping of the file
+    # rather than from a copy of it read into a string first.  Empty
+    # files can't be mapped (and hold no document anyway).
+    with open(path, "rb") as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            data = None
+        else:
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = _load(mm)
+    return parse_dict(data)
+
+
+def parse_header(path: str, max_lines: int = 20) -> dict:
+    """Read a recipe's top-level metadata without parsing the whole file.
+
+    Only the first ``max_lines`` lines are loaded, which is enough for the
+    title/version/theme keys that lead both recipe formats.  If the cut
+    leaves invalid YAML, or the title only appears later, the whole file is
+    parsed instead.
+
+    Returns:
+        A dict with whichever of ``title``, ``version``, ``theme`` and
+        ``description`` the recipe sets.
+
+    Raises:
+        ValueError: If the recipe is not valid YAML.
+    """
+    with open(path, "rb") as fp:
+        head = b"".join(islice(fp, max_lines))
+        truncated = fp.read(1) != b""
+
+    def load_full():
+        with open(path, "rb") as fp:
+            return _load(fp)
+
+    return _header_meta(head, truncated, load_full)
+
+
+def parse_header_text(text: str | bytes, max_lines: int = 20) -> dict:
+    """Like ``parse_header``, for recipe text that is already in memory."""
+    newline = "\n" if isinstance(text, str) else b"\n"
+    end = -1
+    for _ in range(max_lines):
+        end = text.find(newline, end + 1)
+        if end == -1:
+            break
+    truncated = end != -1 and end + 1 < len(text)
+    head = text[:end + 1] if truncated else text
+    return _header_meta(head, truncated, lambda: _load(text))
+
+
+def _header_meta(head, truncated: bool, load_full) -> dict:
+    """Metadata from a recipe's leading lines, parsing it all if needed.
+
+    ``load_full`` loads the complete document; it is only called when
+    ``head`` was cut short and is unparsable or lacks a title.
+    """
+    yaml = _yaml()[0]
+    try:
+        data = _load(head)
+    except yaml.YAMLError as e:
+        if not truncated:
+            raise ValueError(f"Invalid YAML: {e}") from e
+        data = None
+    meta = _header_fields(data)
+    if truncated and "title" not in meta:
+        try:
+            meta = _header_fields(load_full())
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML: {e}") from e
+    return meta
+
+
+def _header_fields(data) -> dict:
+    """Pick the metadata keys out of loaded recipe data."""
+    if not isinstance(data, dict):
+        return {}
+    if isinstance(data.get("canvas"), dict):
+        data = data["canvas"]
+    return {
+        key: data[key]
+        for key in ("title", "version", "theme", "description")
+        if key in data
+    }
+
+
+def parse_dict(data: dict) -> Canvas:
+    """Build a Canvas from an already-loaded recipe dict.
+
+    Accepts the same structure as the YAML formats, so recipes known at
+    authoring time can skip YAML parsing altogether.
+    """
     if not data:
         raise ValueError("Empty YAML input")
 
@@ -35,12 +182,6 @@ def parse_yaml(yaml_str: str) -> Canvas:
     return _parse_simple_format(data)
 
 
-def parse_file(path: str) -> Canvas:
-    """Parse a YAML file into a Canvas model."""
-    content = Path(path).read_text()
-    return parse_yaml(content)
-
-
 def _parse_hierarchical_format(data: dict) -> Canvas:
     """Parse the hierarchical canvas YAML format (networks/factories/machines/nodes)."""
     canvas = Canvas(
@@ -153,6 +294,16 @@ def _parse_node(data: dict) -> CanvasNode:
 
 def canvas_to_yaml(canvas: Canvas) -> str:
     """Serialize a Canvas model back to YAML."""
+    return _dump(_canvas_to_dict(canvas))
+
+
+def canvas_to_yaml_stream(canvas: Canvas, fp: IO[str]) -> None:
+    """Serialize a Canvas model as YAML directly into an open text stream."""
+    _dump(_canvas_to_dict(canvas), fp)
+
+
+def _canvas_to_dict(canvas: Canvas) -> dict:
+    """Build the hierarchical-format dict for a Canvas model."""
     data = {
         "canvas": {
             "version": canvas.version,
@@ -221,4 +372,4 @@ def canvas_to_yaml(canvas: Canvas) -> str:
             net_data["factories"].append(fac_data)
         data["canvas"]["networks"].append(net_data)
 
-    return yaml.dump(data, default_flow_style=False, sort_keys=False)
+    return data
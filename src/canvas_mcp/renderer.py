@@ -4,11 +4,18 @@ from __future__ import annotations
 
 import math
 import textwrap
+from dataclasses import dataclass
+from functools import lru_cache
 from io import BytesIO
+from itertools import accumulate
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from PIL import Image, ImageDraw, ImageFont
+# Pillow is imported where it is first needed (font loading and image
+# creation), so importing the renderer stays cheap; these names are only
+# used in annotations here.
+if TYPE_CHECKING:
+    from PIL import ImageDraw, ImageFont
 
 from .models import Canvas, CanvasNode, CanvasFactory, CanvasMachine, ContainerStyle, NodeStyle
 from .organize import organize_canvas
@@ -16,9 +23,14 @@ from .themes import get_theme, ThemePalette
 
 
 # --- Font handling ---
+# Fonts are cached per size so renderers created for each request share
+# the loaded FreeType faces instead of re-reading the font files.
 
+@lru_cache(maxsize=None)
 def _load_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
     """Load a font, falling back to default if none available."""
+    from PIL import ImageFont
+
     font_paths = [
         "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
         "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
@@ -31,8 +43,11 @@ def _load_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
     return ImageFont.load_default()
 
 
+@lru_cache(maxsize=None)
 def _load_bold_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
     """Load a bold font, falling back to regular."""
+    from PIL import ImageFont
+
     font_paths = [
         "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
         "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
@@ -47,6 +62,10 @@ def _load_bold_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
 
 # --- Color helpers ---
 
+# Pillow accepts either a hex string or an RGB tuple wherever a color goes
+_Color = str | tuple[int, int, int]
+
+
 def _hex_to_rgb(hex_color: str) -> tuple[int, int, int]:
     """Convert hex color to RGB tuple. Supports both 3-char and 6-char hex."""
     hex_color = hex_color.lstrip("#")
@@ -55,31 +74,78 @@ def _hex_to_rgb(hex_color: str) -> tuple[int, int, int]:
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
 
-def _hex_to_rgba(hex_color: str, alpha: int = 255) -> tuple[int, int, int, int]:
-    """Convert hex color to RGBA tuple."""
-    r, g, b = _hex_to_rgb(hex_color)
-    return (r, g, b, alpha)
+def _blend_over(hex_color: str, alpha: int, background: str) -> tuple[int, int, int]:
+    """Pre-blend a translucent color over an opaque background.
+
+    Returns the solid RGB color that ``hex_color`` at ``alpha`` (0-255)
+    produces when composited onto ``background``.
+    """
+    fr, fg, fb = _hex_to_rgb(hex_color)
+    br, bg, bb = _hex_to_rgb(background)
+    inv = 255 - alpha
+    return (
+        (alpha * fr + inv * br) // 255,
+        (alpha * fg + inv * bg) // 255,
+        (alpha * fb + inv * bb) // 255,
+    )
+
 
+def _lerp_rgb(
+    hex_color: str, tr: int, tg: int, tb: int, factor: float
+) -> tuple[int, int, int]:
+    """Blend a hex color toward the RGB target (tr, tg, tb).
 
-def _darken(hex_color: str, factor: float = 0.6) -> str:
-    """Darken a hex color."""
+    factor=0.0 returns the original color, factor=1.0 returns the target.
+    Lighten with a white target; darken to ``f`` of the original
+    brightness with ``_lerp_rgb(c, 0, 0, 0, 1 - f)``.
+    """
     r, g, b = _hex_to_rgb(hex_color)
-    r = int(r * factor)
-    g = int(g * factor)
-    b = int(b * factor)
-    return f"#{r:02x}{g:02x}{b:02x}"
+    return (
+        int(r + (tr - r) * factor),
+        int(g + (tg - g) * factor),
+        int(b + (tb - b) * factor),
+    )
+
 
+# --- Geometry helpers ---
 
-def _lighten(hex_color: str, factor: float = 0.3) -> str:
-    """Lighten a hex color by blending toward white.
+def _node_extent(nodes: list[CanvasNode]) -> tuple[float, float, float, float]:
+    """Return (min_x, min_y, max_x, max_y) of a non-empty set of nodes.
 
-    factor=0.0 returns the original color, factor=1.0 returns white.
+    Walks the node list once instead of running four separate min/max
+    passes over it.
     """
-    r, g, b = _hex_to_rgb(hex_color)
-    r = int(r + (255 - r) * factor)
-    g = int(g + (255 - g) * factor)
-    b = int(b + (255 - b) * factor)
-    return f"#{r:02x}{g:02x}{b:02x}"
+    first = nodes[0]
+    min_x = first.x
+    min_y = first.y
+    max_x = first.x + first.width
+    max_y = first.y + first.height
+    for n in nodes:
+        x = n.x
+        y = n.y
+        if x < min_x:
+            min_x = x
+        if y < min_y:
+            min_y = y
+        right = x + n.width
+        bottom = y + n.height
+        if right > max_x:
+            max_x = right
+        if bottom > max_y:
+            max_y = bottom
+    return (min_x, min_y, max_x, max_y)
+
+
+def _merge_extents(
+    extents: list[tuple[float, float, float, float]],
+) -> tuple[float, float, float, float]:
+    """Return the extent enclosing every extent in a non-empty list."""
+    return (
+        min(e[0] for e in extents),
+        min(e[1] for e in extents),
+        max(e[2] for e in extents),
+        max(e[3] for e in extents),
+    )
 
 
 # --- Drawing primitives ---
@@ -88,8 +154,8 @@ def _draw_rounded_rect(
     draw: ImageDraw.ImageDraw,
     xy: tuple[float, float, float, float],
     radius: int,
-    fill: Optional[str] = None,
-    outline: Optional[str] = None,
+    fill: Optional[_Color] = None,
+    outline: Optional[_Color] = None,
     width: int = 1,
 ):
     """Draw a rounded rectangle."""
@@ -103,11 +169,49 @@ def _draw_rounded_rect(
     )
 
 
+# Number of line segments used to approximate each connector curve
+BEZIER_STEPS = 30
+
+
+@lru_cache(maxsize=None)
+def _bezier_weights(steps: int) -> tuple[tuple[float, float, float, float], ...]:
+    """Cubic Bernstein weights for ``steps + 1`` evenly spaced values of t."""
+    weights = []
+    for i in range(steps + 1):
+        t = i / steps
+        weights.append((
+            (1-t)**3,
+            3*(1-t)**2*t,
+            3*(1-t)*t**2,
+            t**3,
+        ))
+    return tuple(weights)
+
+
+def _bezier_points(
+    sx: float, sy: float,
+    cp1x: float, cp1y: float,
+    cp2x: float, cp2y: float,
+    ex: float, ey: float,
+    steps: int,
+) -> list[tuple[float, float]]:
+    """Sample a cubic bezier curve at ``steps + 1`` points.
+
+    The Bernstein weights depend only on ``steps`` and are shared across
+    every curve, leaving four multiply-adds per coordinate per point.
+    """
+    return [
+        (w0 * sx + w1 * cp1x + w2 * cp2x + w3 * ex,
+         w0 * sy + w1 * cp1y + w2 * cp2y + w3 * ey)
+        for w0, w1, w2, w3 in _bezier_weights(steps)
+    ]
+
+
 def _draw_arrow(
     draw: ImageDraw.ImageDraw,
     start: tuple[float, float],
     end: tuple[float, float],
-    color: str = "#585b70",
+    color: _Color = "#585b70",
     width: int = 2,
     arrow_size: int = 10,
 ):
@@ -134,6 +238,17 @@ def _draw_arrow(
     draw.polygon([(end[0], end[1]), (ax, ay), (bx, by)], fill=color)
 
 
+@lru_cache(maxsize=4096)
+def _text_bbox(font: ImageFont.FreeTypeFont, text: str) -> tuple[int, int, int, int]:
+    """``font.getbbox(text)``, memoized.
+
+    Labels, type names and wrapped content lines repeat heavily within and
+    across renders, and fonts are shared per size (see ``_load_font``), so
+    the font object itself is a stable cache key.
+    """
+    return font.getbbox(text)
+
+
 def _wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[str]:
     """Word-wrap text to fit within max_width pixels."""
     words = text.split()
@@ -142,7 +257,7 @@ def _wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[
 
     for word in words:
         test = f"{current} {word}".strip() if current else word
-        bbox = font.getbbox(test)
+        bbox = _text_bbox(font, test)
         tw = bbox[2] - bbox[0]
         if tw <= max_width:
             current = test
@@ -150,7 +265,8 @@ def _wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[
             if current:
                 lines.append(current)
             # If single word is too long, force-wrap it
-            if font.getbbox(word)[2] - font.getbbox(word)[0] > max_width:
+            word_bbox = _text_bbox(font, word)
+            if word_bbox[2] - word_bbox[0] > max_width:
                 # Character-level wrap
                 for chunk in textwrap.wrap(word, width=max(1, max_width // 8)):
                     lines.append(chunk)
@@ -164,8 +280,60 @@ def _wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[
     return lines if lines else [""]
 
 
+# --- Per-render node records ---
+
+@dataclass(slots=True)
+class _NodeRecord:
+    """Drawing data for one node, resolved once per render.
+
+    Coordinates are in image space (offset and scaled).  ``ports`` maps
+    each port name ('input', 'output', 'top', 'bottom') to its anchor
+    point so connection drawing never has to recompute node geometry.
+    """
+    x: float
+    y: float
+    w: float
+    h: float
+    cx: float
+    cy: float
+    ports: dict[str, tuple[float, float]]
+    border_color: str
+    fill_color: str
+    label_color: str
+    badge_color: tuple[int, int, int]
+    conn_color: tuple[int, int, int]
+    corner_radius: int
+    border_width: int
+    label: str
+    label_text_h: int
+    type_text: str
+    type_bbox: tuple[int, int, int, int]
+    content_y: float
+    content_lines: list[str]
+
+
 # --- Main renderer ---
 
+# File buffer for direct-to-disk saves (see CanvasRenderer._draw)
+_WRITE_BUFFER = 1 << 20
+
+
+def _save_args(output_format: str, compress_level: int = 6) -> dict:
+    """Pillow ``save`` arguments for an output format.
+
+    PNG defaults to zlib's default effort: optimize=True costs several
+    times the encode time for a few percent of size.  ``compress_level``
+    only applies to PNG.
+    """
+    if output_format == "png":
+        return {"format": "PNG", "compress_level": compress_level}
+    if output_format == "webp":
+        # method=0 skips lossless compression entirely and balloons
+        # the output; method=1 is the cheapest effort that compresses.
+        return {"format": "WEBP", "lossless": True, "method": 1}
+    raise ValueError(f"Unknown output format '{output_format}'. Valid formats: png, webp")
+
+
 class CanvasRenderer:
     """Renders a Canvas model to a PNG image."""
 
@@ -195,6 +363,22 @@ class CanvasRenderer:
         self.font_small = _load_font(int(14 * scale))
         self.theme: ThemePalette = get_theme("dark")  # Default theme
 
+        # Scale-adjusted layout constants, resolved once per renderer
+        self._s_padding = int(self.NODE_PADDING * scale)
+        self._s_top_bar = int(self.NODE_TOP_BAR * scale)
+        self._s_label_gap = int(self.NODE_LABEL_GAP * scale)
+        self._s_content_gap = int(self.NODE_CONTENT_GAP * scale)
+        self._s_bottom_pad = int(self.NODE_BOTTOM_PAD * scale)
+        self._s_line_h = int(self.NODE_LINE_HEIGHT * scale)
+        self._s_badge_margin = int(10 * scale)
+        self._s_arrow_size = int(18 * scale)
+        self._s_cp_min = 40 * scale      # minimum bezier control-point offset
+        self._s_title_y = 15 * scale
+
+        # Pillow advances multiline text by the height of "A" plus
+        # ``spacing``; pick the spacing that yields NODE_LINE_HEIGHT.
+        self._body_line_spacing = self._s_line_h - self.font_body.getbbox("A")[3]
+
     def compute_node_size(self, node: CanvasNode) -> tuple[float, float]:
         """Measure the required width and height for a node based on its text.
 
@@ -216,7 +400,7 @@ class CanvasRenderer:
         # --- Width ---
         # Start from label width
         label = node.get_label()
-        label_bbox = self.font_label.getbbox(label)
+        label_bbox = _text_bbox(self.font_label, label)
         label_width = label_bbox[2] - label_bbox[0]
 
         # Determine available text width: we want at least label_width,
@@ -224,7 +408,7 @@ class CanvasRenderer:
         # prefer the larger of label width and a comfortable content width.
         # We'll also measure the type badge to make sure it fits.
         type_text = node.type
-        type_bbox = self.font_small.getbbox(type_text)
+        type_bbox = _text_bbox(self.font_small, type_text)
         type_badge_w = type_bbox[2] - type_bbox[0] + 12 + 10  # badge + right margin
 
         # Content measurement: wrap at a reasonable width and check
@@ -236,7 +420,7 @@ class CanvasRenderer:
             max_wrap = self.MAX_NODE_WIDTH - 2 * padding
             content_lines = _wrap_text(node.content, self.font_body, max_wrap)
             for line in content_lines:
-                lbbox = self.font_body.getbbox(line)
+                lbbox = _text_bbox(self.font_body, line)
                 lw = lbbox[2] - lbbox[0]
                 content_width = max(content_width, lw)
 
@@ -266,13 +450,20 @@ class CanvasRenderer:
 
         return (float(round(width)), float(round(height)))
 
-    def auto_size_nodes(self, canvas: Canvas) -> None:
+    def auto_size_nodes(
+        self, canvas: Canvas, nodes: Optional[list[CanvasNode]] = None
+    ) -> None:
         """Measure all nodes and update their width/height to fit their text.
 
         This should be called BEFORE layout (organize or auto-layout) so the
         layout algorithm uses correct node dimensions for spacing.
+
+        ``nodes`` may pass an already-collected ``canvas.all_nodes()`` list
+        to avoid walking the hierarchy again.
         """
-        for node in canvas.all_nodes():
+        if nodes is None:
+            nodes = canvas.all_nodes()
+        for node in nodes:
             w, h = self.compute_node_size(node)
             node.width = w
             node.height = h
@@ -284,22 +475,41 @@ class CanvasRenderer:
         organize: bool = False,
         spacing_level: str = "container",
         orientation: str = "horizontal",
+        output_format: str = "png",
+        return_bytes: bool = True,
+        compress_level: int = 6,
     ) -> bytes:
-        """Render the canvas to PNG bytes. Optionally save to file.
+        """Render the canvas to image bytes. Optionally save to file.
 
         Args:
             canvas: The canvas to render.
-            output_path: Optional path to save the PNG.
+            output_path: Optional path to save the image.
             organize: If True, apply the hierarchical organize algorithm for
                       automatic layout with breathing room.
             spacing_level: Spacing level for organize ("node", "container", "network").
             orientation: Layout direction — "horizontal" or "vertical" (top→bottom).
+            output_format: Encoding — "png" (default) or "webp" (lossless,
+                           typically a third of the PNG size for flat diagrams).
+            return_bytes: When False and ``output_path`` is set, encode
+                          directly to the file and return ``b""`` instead of
+                          keeping the encoded image in memory.
+            compress_level: zlib level (0-9) for PNG output.  1 encodes
+                            several times faster for somewhat larger files,
+                            which suits previews and tests.
+
+        Raises:
+            ValueError: If output_format is not recognized
         """
+        save_args = _save_args(output_format, compress_level)
+
         # Set theme from canvas
         self.theme = get_theme(canvas.theme)
 
+        # Collect the nodes once; layout moves them but never regroups them
+        nodes = canvas.all_nodes()
+
         # Auto-size nodes to fit their text content BEFORE layout
-        self.auto_size_nodes(canvas)
+        self.auto_size_nodes(canvas, nodes)
 
         # Auto-layout: always use hierarchical organize by default.
         # The simple fallback only applies when organize is explicitly disabled
@@ -307,16 +517,54 @@ class CanvasRenderer:
         if organize:
             organize_canvas(canvas, spacing_level=spacing_level, orientation=orientation)
         else:
-            self._auto_layout_if_needed(canvas)
+            self._auto_layout_if_needed(canvas, nodes)
+
+        return self._draw(canvas, nodes, output_path, save_args, return_bytes)
+
+    def render_prepositioned(
+        self,
+        canvas: Canvas,
+        output_path: Optional[str] = None,
+        output_format: str = "png",
+        return_bytes: bool = True,
+        compress_level: int = 6,
+    ) -> bytes:
+        """Render a canvas whose nodes already carry their final positions.
 
+        Nodes are still auto-sized to fit their text, but no layout pass
+        (organize or the all-at-origin fallback) is run.  Arguments are as
+        for ``render``.
+
+        Raises:
+            ValueError: If output_format is not recognized
+        """
+        save_args = _save_args(output_format, compress_level)
+        self.theme = get_theme(canvas.theme)
+        nodes = canvas.all_nodes()
+        self.auto_size_nodes(canvas, nodes)
+        return self._draw(canvas, nodes, output_path, save_args, return_bytes)
+
+    def _draw(
+        self,
+        canvas: Canvas,
+        nodes: list[CanvasNode],
+        output_path: Optional[str],
+        save_args: dict,
+        return_bytes: bool,
+    ) -> bytes:
+        """Draw the laid-out canvas and encode it (see ``render``)."""
         # Calculate canvas bounds from node positions
-        bounds = self._calculate_bounds(canvas)
+        bounds = self._calculate_bounds(canvas, nodes)
         img_width = int(bounds["width"] * self.scale)
         img_height = int(bounds["height"] * self.scale)
 
-        # Create image - use theme background color
+        # Create image - use theme background color.  The background is
+        # always opaque and translucent container fills are pre-blended
+        # against it, so no alpha channel is needed.
         bg_color = self.theme.background
-        img = Image.new("RGBA", (img_width, img_height), _hex_to_rgba(bg_color))
+        from PIL import Image, ImageDraw
+
+        img = Image.new("RGB", (img_width, img_height), _hex_to_rgb(bg_color))
         draw = ImageDraw.Draw(img)
 
         # Offset for translating node coordinates to image space
@@ -326,33 +574,60 @@ class CanvasRenderer:
         # Draw title
         self._draw_title(draw, canvas.title, img_width)
 
-        # Draw containers (machines, factories) as subtle grouped backgrounds
+        # Draw containers (machines, factories) as subtle grouped backgrounds.
+        # Each machine's extent is measured once and reused for the factory
+        # container that encloses it.
         for network in canvas.networks:
             for factory in network.factories:
-                self._draw_factory_container(draw, factory, ox, oy)
-                for machine in factory.machines:
-                    self._draw_machine_container(draw, machine, ox, oy)
+                machine_extents = [
+                    (machine, _node_extent(machine.nodes))
+                    for machine in factory.machines
+                    if machine.nodes
+                ]
+                if not machine_extents:
+                    continue
+                factory_extent = _merge_extents([e for _, e in machine_extents])
+                self._draw_factory_container(draw, factory, factory_extent, ox, oy)
+                for machine, extent in machine_extents:
+                    self._draw_machine_container(draw, machine, extent, ox, oy)
+
+        # Resolve styles, port anchors and text layout for every node once.
+        # Every node is drawn, even ones sharing an id; connection endpoints
+        # resolve by id to the last such node, as ``Canvas.get_node`` does.
+        node_records = [self._build_node_record(node, ox, oy) for node in nodes]
+        records = {node.id: record for node, record in zip(nodes, node_records)}
 
         # Draw connections first (behind nodes)
-        self._draw_connections(draw, canvas, ox, oy)
+        self._draw_connections(draw, canvas, records)
 
         # Draw nodes
-        for node in canvas.all_nodes():
-            self._draw_node(draw, node, ox, oy)
+        draw_node = self._draw_node
+        for record in node_records:
+            draw_node(draw, record)
+
+        if output_path and not return_bytes:
+            # Stream straight to disk without holding the encoded image.
+            # Pillow writes the PNG chunk by chunk; a large file buffer
+            # coalesces those into a few write(2) calls.
+            with open(output_path, "wb", buffering=_WRITE_BUFFER) as fp:
+                img.save(fp, **save_args)
+            return b""
 
-        # Convert to bytes
         buf = BytesIO()
-        img.save(buf, format="PNG", optimize=True)
-        png_bytes = buf.getvalue()
+        img.save(buf, **save_args)
+        image_bytes = buf.getvalue()
 
         if output_path:
-            Path(output_path).write_bytes(png_bytes)
+            Path(output_path).write_bytes(image_bytes)
 
-        return png_bytes
+        return image_bytes
 
-    def _auto_layout_if_needed(self, canvas: Canvas):
+    def _auto_layout_if_needed(
+        self, canvas: Canvas, nodes: Optional[list[CanvasNode]] = None
+    ):
         """If all nodes are at (0,0), auto-layout them."""
-        nodes = canvas.all_nodes()
+        if nodes is None:
+            nodes = canvas.all_nodes()
         if not nodes:
             return
 
@@ -367,19 +642,25 @@ class CanvasRenderer:
 
         for network in canvas.networks:
             for factory in network.factories:
-                factory_start_y = y_offset
                 for machine in factory.machines:
-                    x = x_offset
-                    for node in machine.nodes:
+                    # Each node starts where the previous one ends plus
+                    # 120 of horizontal spacing: a running sum of widths.
+                    xs = accumulate(
+                        (node.width + 120 for node in machine.nodes),
+                        initial=x_offset,
+                    )
+                    for node, x in zip(machine.nodes, xs):
                         node.x = x
                         node.y = y_offset
-                        x += node.width + 120  # horizontal spacing
                     y_offset += 280  # vertical spacing between machines
                 y_offset += 80  # extra gap between factories
 
-    def _calculate_bounds(self, canvas: Canvas) -> dict:
+    def _calculate_bounds(
+        self, canvas: Canvas, nodes: Optional[list[CanvasNode]] = None
+    ) -> dict:
         """Calculate the bounding box of all nodes, including container chrome."""
-        nodes = canvas.all_nodes()
+        if nodes is None:
+            nodes = canvas.all_nodes()
         if not nodes:
             return {"min_x": 0, "min_y": 0, "width": 400, "height": 300}
 
@@ -387,10 +668,11 @@ class CanvasRenderer:
         # beyond the node bounds by CONTAINER_PADDING + CONTAINER_LABEL_HEIGHT)
         container_margin = self.CONTAINER_PADDING + self.CONTAINER_LABEL_HEIGHT + 20  # factory expand
 
-        min_x = min(n.x for n in nodes) - self.PADDING - container_margin
-        min_y = min(n.y for n in nodes) - self.PADDING - container_margin - 50  # Title space
-        max_x = max(n.x + n.width for n in nodes) + self.PADDING + container_margin
-        max_y = max(n.y + n.height for n in nodes) + self.PADDING + container_margin
+        min_x, min_y, max_x, max_y = _node_extent(nodes)
+        min_x = min_x - self.PADDING - container_margin
+        min_y = min_y - self.PADDING - container_margin - 50  # Title space
+        max_x = max_x + self.PADDING + container_margin
+        max_y = max_y + self.PADDING + container_margin
 
         return {
             "min_x": min_x,
@@ -404,24 +686,31 @@ class CanvasRenderer:
         bbox = self.font_title.getbbox(title)
         tw = bbox[2] - bbox[0]
         x = (img_width - tw) / 2
-        draw.text((x, 15 * self.scale), title, fill=self.theme.title_color, font=self.font_title)
+        draw.text((x, self._s_title_y), title, fill=self.theme.title_color, font=self.font_title)
 
-    def _get_container_bounds(self, nodes: list[CanvasNode]) -> tuple[float, float, float, float]:
-        """Get bounding box for a set of nodes."""
-        if not nodes:
-            return (0, 0, 0, 0)
+    def _get_container_bounds(
+        self, extent: tuple[float, float, float, float]
+    ) -> tuple[float, float, float, float]:
+        """Get the padded container bounding box for a node extent."""
         pad = self.CONTAINER_PADDING
-        min_x = min(n.x for n in nodes) - pad
-        min_y = min(n.y for n in nodes) - pad - self.CONTAINER_LABEL_HEIGHT
-        max_x = max(n.x + n.width for n in nodes) + pad
-        max_y = max(n.y + n.height for n in nodes) + pad
-        return (min_x, min_y, max_x, max_y)
+        min_x, min_y, max_x, max_y = extent
+        return (
+            min_x - pad,
+            min_y - pad - self.CONTAINER_LABEL_HEIGHT,
+            max_x + pad,
+            max_y + pad,
+        )
 
-    def _draw_machine_container(self, draw: ImageDraw.ImageDraw, machine: CanvasMachine, ox: float, oy: float):
+    def _draw_machine_container(
+        self,
+        draw: ImageDraw.ImageDraw,
+        machine: CanvasMachine,
+        extent: tuple[float, float, float, float],
+        ox: float,
+        oy: float,
+    ):
         """Draw a subtle container around a machine's nodes."""
-        if not machine.nodes:
-            return
-        x1, y1, x2, y2 = self._get_container_bounds(machine.nodes)
+        x1, y1, x2, y2 = self._get_container_bounds(extent)
         x1 = (x1 + ox) * self.scale
         y1 = (y1 + oy) * self.scale
         x2 = (x2 + ox) * self.scale
@@ -439,7 +728,7 @@ class CanvasRenderer:
         _draw_rounded_rect(
             draw, (x1, y1, x2, y2),
             radius=radius,
-            fill=_hex_to_rgba(fill_hex, fill_alpha),
+            fill=_blend_over(fill_hex, fill_alpha, self.theme.background),
             outline=outline_color,
             width=border_w,
         )
@@ -452,15 +741,16 @@ class CanvasRenderer:
             font=self.font_container,
         )
 
-    def _draw_factory_container(self, draw: ImageDraw.ImageDraw, factory: CanvasFactory, ox: float, oy: float):
+    def _draw_factory_container(
+        self,
+        draw: ImageDraw.ImageDraw,
+        factory: CanvasFactory,
+        extent: tuple[float, float, float, float],
+        ox: float,
+        oy: float,
+    ):
         """Draw a container around a factory's machines."""
-        all_nodes = []
-        for machine in factory.machines:
-            all_nodes.extend(machine.nodes)
-        if not all_nodes:
-            return
-
-        x1, y1, x2, y2 = self._get_container_bounds(all_nodes)
+        x1, y1, x2, y2 = self._get_container_bounds(extent)
         # Expand a bit beyond machine containers
         expand = 20
         x1 = (x1 - expand + ox) * self.scale
@@ -479,7 +769,7 @@ class CanvasRenderer:
         fill = None
         if s and s.fill_color:
             fill_alpha = s.alpha if s.alpha is not None else 80
-            fill = _hex_to_rgba(s.fill_color, fill_alpha)
+            fill = _blend_over(s.fill_color, fill_alpha, self.theme.background)
 
         _draw_rounded_rect(
             draw, (x1, y1, x2, y2),
@@ -497,8 +787,83 @@ class CanvasRenderer:
             font=self.font_container,
         )
 
+    def _build_node_record(self, node: CanvasNode, ox: float, oy: float) -> _NodeRecord:
+        """Resolve everything needed to draw a node and connect to it.
+
+        Text positioning uses the same constants as ``compute_node_size``
+        so auto-sized nodes always have room for their content.
+        """
+        style = node.get_style()
+        s = self.scale  # shorthand
+
+        x = (node.x + ox) * s
+        y = (node.y + oy) * s
+        w = node.width * s
+        h = node.height * s
+
+        # Port anchor points:
+        #   input   → left edge, vertical center
+        #   output  → right edge, vertical center
+        #   top     → top edge, horizontal center
+        #   bottom  → bottom edge, horizontal center
+        ports = {
+            "input": ((node.x + ox) * s, (node.y + node.height / 2 + oy) * s),
+            "output": ((node.x + node.width + ox) * s, (node.y + node.height / 2 + oy) * s),
+            "top": ((node.x + node.width / 2 + ox) * s, (node.y + oy) * s),
+            "bottom": ((node.x + node.width / 2 + ox) * s, (node.y + node.height + oy) * s),
+        }
+
+        # Use theme-aware colors (custom style overrides theme)
+        fill_color = style.fill_color if node.style and node.style.fill_color else self.theme.node_fill
+        label_color = style.label_color if node.style and node.style.label_color else self.theme.node_label
+
+        # Label and content placement — consistent with compute_node_size
+        label = node.get_label()
+        label_bbox = _text_bbox(self.font_label, label)
+        label_text_h = label_bbox[3] - label_bbox[1]
+        label_y = y + self._s_top_bar + self._s_label_gap
+        content_y = label_y + label_text_h + self._s_content_gap
+
+        display_lines: list[str] = []
+        if node.content:
+            max_text_width = int(w - 2 * self.NODE_PADDING * s)
+            line_height = self._s_line_h
+            lines = _wrap_text(node.content, self.font_body, max_text_width)
+            # With auto-sizing, all lines should fit. But add a safety limit
+            # in case the node was manually sized smaller.
+            available_h = h - (content_y - y) - self._s_bottom_pad
+            max_lines = max(1, int(available_h / line_height)) if available_h > 0 else 1
+            display_lines = lines[:max_lines]
+            if len(lines) > max_lines:
+                display_lines[-1] = display_lines[-1][:20] + "..."
+
+        return _NodeRecord(
+            x=x,
+            y=y,
+            w=w,
+            h=h,
+            cx=x + w / 2,
+            cy=y + h / 2,
+            ports=ports,
+            border_color=style.border_color,
+            fill_color=fill_color,
+            label_color=label_color,
+            badge_color=_lerp_rgb(style.border_color, 0, 0, 0, 1 - 0.3),
+            # Lighten the source color so connectors are clearly visible
+            # against the dark (#11111b) canvas background.
+            conn_color=_lerp_rgb(style.border_color, 255, 255, 255, 0.25),
+            corner_radius=int(style.corner_radius * s),
+            border_width=int(style.border_width * s),
+            label=label,
+            label_text_h=label_text_h,
+            type_text=node.type,
+            type_bbox=_text_bbox(self.font_small, node.type),
+            content_y=content_y,
+            content_lines=display_lines,
+        )
+
     def _determine_port(
-        self, source: CanvasNode, target: CanvasNode
+        self, source: _NodeRecord, target: _NodeRecord
     ) -> tuple[str, str]:
         """Determine connection ports based on relative node positions.
 
@@ -516,20 +881,14 @@ class CanvasRenderer:
             'bottom'  → bottom edge center
             'top'     → top edge center
         """
-        # Centers of each node
-        src_cx = source.x + source.width / 2
-        src_cy = source.y + source.height / 2
-        tgt_cx = target.x + target.width / 2
-        tgt_cy = target.y + target.height / 2
-
-        dx = tgt_cx - src_cx
-        dy = tgt_cy - src_cy
+        dx = target.cx - source.cx
+        dy = target.cy - source.cy
 
         # Horizon threshold: if vertical distance is dominant and significant
         # we switch to vertical connectors. "Significant" = more than 1.5×
         # the source node height AND the vertical component is larger than
         # the horizontal component.
-        horizon = source.height * 1.5
+        horizon = source.h * 1.5
 
         if abs(dy) > horizon and abs(dy) > abs(dx):
             if dy > 0:
@@ -545,68 +904,53 @@ class CanvasRenderer:
         else:
             return ("input", "output")
 
-    def _get_port_coordinates(
-        self, node: CanvasNode, port: str, ox: float, oy: float
-    ) -> tuple[float, float]:
-        """Get the anchor point coordinates for a given port on a node.
-
-        Port coordinate mapping:
-            input   → left edge, vertical center
-            output  → right edge, vertical center
-            top     → top edge, horizontal center
-            bottom  → bottom edge, horizontal center
-        """
-        if port == "input":
-            x = (node.x + ox) * self.scale
-            y = (node.y + node.height / 2 + oy) * self.scale
-        elif port == "output":
-            x = (node.x + node.width + ox) * self.scale
-            y = (node.y + node.height / 2 + oy) * self.scale
-        elif port == "top":
-            x = (node.x + node.width / 2 + ox) * self.scale
-            y = (node.y + oy) * self.scale
-        elif port == "bottom":
-            x = (node.x + node.width / 2 + ox) * self.scale
-            y = (node.y + node.height + oy) * self.scale
-        else:
-            # Fallback to output
-            x = (node.x + node.width + ox) * self.scale
-            y = (node.y + node.height / 2 + oy) * self.scale
-        return (x, y)
-
-    def _draw_connections(self, draw: ImageDraw.ImageDraw, canvas: Canvas, ox: float, oy: float):
+    def _draw_connections(
+        self, draw: ImageDraw.ImageDraw, canvas: Canvas, records: dict[str, _NodeRecord]
+    ):
         """Draw all connections between nodes.
 
+        Endpoints are resolved against ``records`` — the id-keyed table
+        built from the nodes being drawn — so each edge costs two dict
+        lookups and dangling ids are skipped.
+
         Port selection is emergent from node geometry — if a target node
         sits below a certain horizon from its source, the connection
         automatically switches from side ports (horizontal tree) to
         top/bottom ports (vertical tree).
         """
+        # Bound once: this loop runs per edge
+        get_record = records.get
+        determine_port = self._determine_port
+        draw_bezier = self._draw_bezier_connection
+        min_span = 2 * self.scale
+
         for source_id, target_id in canvas.all_connections():
-            source = canvas.get_node(source_id)
-            target = canvas.get_node(target_id)
+            source = get_record(source_id)
+            target = get_record(target_id)
             if not source or not target:
                 continue
 
             # Determine ports based on relative position (the key feature)
-            from_port, to_port = self._determine_port(source, target)
+            from_port, to_port = determine_port(source, target)
 
             # Get anchor coordinates from the chosen ports
-            sx, sy = self._get_port_coordinates(source, from_port, ox, oy)
-            tx, ty = self._get_port_coordinates(target, to_port, ox, oy)
+            sx, sy = source.ports[from_port]
+            tx, ty = target.ports[to_port]
+
+            # Degenerate connection (ports within a couple of pixels): the
+            # curve and arrowhead would collapse onto one spot, so skip the
+            # bezier sampling and draw a plain segment.
+            if abs(tx - sx) + abs(ty - sy) < min_span:
+                draw.line([(sx, sy), (tx, ty)], fill=source.conn_color, width=4)
+                continue
 
             # Connection direction for bezier control points
             is_vertical = from_port in ("top", "bottom")
 
-            # Determine connection color based on source type
-            # Lighten the source color so connectors are clearly visible
-            # against the dark (#11111b) canvas background.
-            style = source.get_style()
-            conn_color = _lighten(style.border_color, 0.25)
-
-            # Draw bezier-like connection using line segments
-            self._draw_bezier_connection(
-                draw, (sx, sy), (tx, ty), conn_color, direction="vertical" if is_vertical else "horizontal"
+            # Draw bezier-like connection using line segments, colored
+            # by source type
+            draw_bezier(
+                draw, (sx, sy), (tx, ty), source.conn_color, direction="vertical" if is_vertical else "horizontal"
             )
 
     def _draw_bezier_connection(
@@ -614,7 +958,7 @@ class CanvasRenderer:
         draw: ImageDraw.ImageDraw,
         start: tuple[float, float],
         end: tuple[float, float],
-        color: str,
+        color: _Color,
         width: int = 4,
         direction: str = "horizontal",
     ):
@@ -630,7 +974,7 @@ class CanvasRenderer:
         if direction == "vertical":
             # Vertical S-curve: control points extend up/down
             dy = abs(ey - sy)
-            cp_offset = max(dy * 0.4, 40 * self.scale)
+            cp_offset = max(dy * 0.4, self._s_cp_min)
 
             # CP1 extends downward from start (if going down) or upward
             cp1x = sx
@@ -641,7 +985,7 @@ class CanvasRenderer:
         else:
             # Horizontal S-curve: control points extend left/right
             dx = abs(ex - sx)
-            cp_offset = max(dx * 0.4, 40 * self.scale)
+            cp_offset = max(dx * 0.4, self._s_cp_min)
 
             cp1x = sx + (cp_offset if ex > sx else -cp_offset)
             cp1y = sy
@@ -649,112 +993,76 @@ class CanvasRenderer:
             cp2y = ey
 
         # Generate bezier points
-        points = []
-        steps = 30
-        for i in range(steps + 1):
-            t = i / steps
-            # Cubic bezier
-            x = (1-t)**3 * sx + 3*(1-t)**2*t * cp1x + 3*(1-t)*t**2 * cp2x + t**3 * ex
-            y = (1-t)**3 * sy + 3*(1-t)**2*t * cp1y + 3*(1-t)*t**2 * cp2y + t**3 * ey
-            points.append((x, y))
-
-        # Draw the curve
-        for i in range(len(points) - 1):
-            draw.line([points[i], points[i+1]], fill=color, width=width)
+        points = _bezier_points(sx, sy, cp1x, cp1y, cp2x, cp2y, ex, ey, BEZIER_STEPS)
+
+        # Draw the curve as a single polyline call
+        draw.line(points, fill=color, width=width)
 
         # Arrowhead at end
         if len(points) >= 2:
-            _draw_arrow(draw, points[-2], points[-1], color=color, width=width, arrow_size=int(18 * self.scale))
+            _draw_arrow(draw, points[-2], points[-1], color=color, width=width, arrow_size=self._s_arrow_size)
 
-    def _draw_node(self, draw: ImageDraw.ImageDraw, node: CanvasNode, ox: float, oy: float):
-        """Draw a single node.
+    def _draw_node(self, draw: ImageDraw.ImageDraw, record: _NodeRecord):
+        """Draw a single node from its precomputed record.
 
-        Text positioning uses the same constants as ``compute_node_size``
-        so auto-sized nodes always have room for their content.
+        Called once per node, so the draw primitives are bound locally and
+        called directly rather than through ``_draw_rounded_rect``.
         """
-        style = node.get_style()
-
-        x = (node.x + ox) * self.scale
-        y = (node.y + oy) * self.scale
-        w = node.width * self.scale
-        h = node.height * self.scale
-
-        s = self.scale  # shorthand
-
-        # Use theme-aware fill color (custom style overrides theme)
-        fill_color = style.fill_color if node.style and node.style.fill_color else self.theme.node_fill
+        rounded_rectangle = draw.rounded_rectangle
+        text = draw.text
+        x, y, w, h = record.x, record.y, record.w, record.h
 
         # Node background
-        _draw_rounded_rect(
-            draw, (x, y, x + w, y + h),
-            radius=int(style.corner_radius * s),
-            fill=fill_color,
-            outline=style.border_color,
-            width=int(style.border_width * s),
+        rounded_rectangle(
+            (x, y, x + w, y + h),
+            radius=record.corner_radius,
+            fill=record.fill_color,
+            outline=record.border_color,
+            width=record.border_width,
         )
 
         # Node type indicator bar at top
-        bar_height = int(self.NODE_TOP_BAR * s)
-        _draw_rounded_rect(
-            draw,
+        bar_height = self._s_top_bar
+        rounded_rectangle(
             (x + 2, y + 2, x + w - 2, y + bar_height + 2),
-            radius=int(style.corner_radius * s),
-            fill=style.border_color,
+            radius=record.corner_radius,
+            fill=record.border_color,
         )
 
-        # Label — positioned consistently with compute_node_size
-        # Use theme-aware label color
-        label = node.get_label()
-        label_y = y + bar_height + int(self.NODE_LABEL_GAP * s)
-        label_color = style.label_color if node.style and node.style.label_color else self.theme.node_label
-        draw.text(
-            (x + int(self.NODE_PADDING * s), label_y),
-            label,
-            fill=label_color,
+        # Label
+        label_y = y + bar_height + self._s_label_gap
+        text(
+            (x + self._s_padding, label_y),
+            record.label,
+            fill=record.label_color,
             font=self.font_label,
         )
 
-        # Content text (wrapped) — positioned consistently with compute_node_size
-        label_bbox = self.font_label.getbbox(label)
-        label_text_h = label_bbox[3] - label_bbox[1]
-        content_y = label_y + label_text_h + int(self.NODE_CONTENT_GAP * s)
-        max_text_width = int(w - 2 * self.NODE_PADDING * s)
-        line_height = int(self.NODE_LINE_HEIGHT * s)
-
-        if node.content:
-            lines = _wrap_text(node.content, self.font_body, max_text_width)
-            # With auto-sizing, all lines should fit. But add a safety limit
-            # in case the node was manually sized smaller.
-            available_h = h - (content_y - y) - int(self.NODE_BOTTOM_PAD * s)
-            max_lines = max(1, int(available_h / line_height)) if available_h > 0 else 1
-            display_lines = lines[:max_lines]
-            if len(lines) > max_lines:
-                display_lines[-1] = display_lines[-1][:20] + "..."
-
-            for i, line in enumerate(display_lines):
-                draw.text(
-                    (x + int(self.NODE_PADDING * s), content_y + i * line_height),
-                    line,
-                    fill=self.theme.body_text_color,
-                    font=self.font_body,
-                )
+        # Content text (wrapped), laid out by Pillow in a single call
+        if record.content_lines:
+            draw.multiline_text(
+                (x + self._s_padding, record.content_y),
+                "\n".join(record.content_lines),
+                fill=self.theme.body_text_color,
+                font=self.font_body,
+                spacing=self._body_line_spacing,
+            )
 
         # Type badge in bottom-right
-        type_text = node.type
-        type_bbox = self.font_small.getbbox(type_text)
+        type_bbox = record.type_bbox
         type_w = type_bbox[2] - type_bbox[0] + 12
         type_h = type_bbox[3] - type_bbox[1] + 6
-        type_x = x + w - type_w - int(10 * s)
-        type_y = y + h - type_h - int(10 * s)
+        type_x = x + w - type_w - self._s_badge_margin
+        type_y = y + h - type_h - self._s_badge_margin
 
-        _draw_rounded_rect(
-            draw, (type_x, type_y, type_x + type_w, type_y + type_h),
+        rounded_rectangle(
+            (type_x, type_y, type_x + type_w, type_y + type_h),
             radius=4,
-            fill=_darken(style.border_color, 0.3),
+            fill=record.badge_color,
         )
-        draw.text(
+        text(
             (type_x + 6, type_y + 2),
-            type_text,
-            fill=style.border_color,
+            record.type_text,
+            fill=record.border_color,
             font=self.font_small,
         )
@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
+import asyncio
+import copy
+import hashlib
 import json
 import os
-import uuid
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
 from pathlib import Path
 
 from mcp.server import Server
@@ -12,13 +16,26 @@ from mcp.server.stdio import stdio_server
 from mcp.types import TextContent, ImageContent, Tool
 
 from .models import Canvas, CanvasNetwork, CanvasFactory, CanvasMachine, CanvasNode
-from .parser import parse_yaml, canvas_to_yaml
+from .parser import parse_yaml, parse_header, parse_header_text, canvas_to_yaml_stream
 from .renderer import CanvasRenderer
 
+# orjson is optional; it encodes the tool responses considerably faster
+# than the stdlib encoder when it happens to be installed.
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _dumps = json.dumps
+
 
 # --- Constants ---
 OUTPUT_DIR = Path(os.environ.get("CANVAS_OUTPUT_DIR", Path.home() / ".rhode" / "canvas"))
-TEMPLATES_DIR = Path(__file__).parent.parent.parent / "templates"
+TEMPLATES_DIR = Path(os.environ.get("CANVAS_TEMPLATES_DIR", Path(__file__).parent.parent.parent / "templates"))
+
+# Characters in a canvas title that are replaced when deriving a file name
+_FILENAME_TABLE = str.maketrans({" ": "-", "/": "-", "\\": "-"})
 
 server = Server("canvas-mcp")
 
@@ -27,204 +44,258 @@ def _ensure_output_dir():
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-# --- Tool definitions ---
+async def _render_off_loop(render: Callable[..., bytes], canvas: Canvas, **kwargs) -> None:
+    """Render and write the image in a worker thread.
 
-@server.list_tools()
-async def list_tools() -> list[Tool]:
-    return [
-        Tool(
-            name="render_canvas",
-            description=(
-                "Render a canvas diagram from a YAML recipe string. "
-                "Supports hierarchical format (networks/factories/machines/nodes) "
-                "or a simplified format (flat list of nodes with inputs/outputs). "
-                "Returns the path to the rendered PNG file."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "yaml_recipe": {
-                        "type": "string",
-                        "description": (
-                            "YAML string defining the canvas. Simplified format example:\n"
-                            "title: My Diagram\n"
-                            "nodes:\n"
-                            "  - id: start\n"
-                            "    type: input\n"
-                            "    content: 'Begin here'\n"
-                            "  - id: process\n"
-                            "    type: process\n"
-                            "    content: 'Do work'\n"
-                            "    inputs: [start]\n"
-                            "\n"
-                            "Node types: static, input, ai, source, output, decision, process, default\n"
-                            "Coordinates (x, y) are optional — auto-layout is applied if all are 0."
-                        ),
-                    },
-                    "scale": {
-                        "type": "number",
-                        "description": "Render scale factor (default 2.0 for crisp, legible output)",
-                        "default": 2.0,
-                    },
-                    "filename": {
-                        "type": "string",
-                        "description": "Output filename (without extension). Default: auto-generated UUID.",
-                    },
-                    "organize": {
-                        "type": "boolean",
-                        "description": (
-                            "Apply the hierarchical organize algorithm for "
-                            "automatic layout with proper breathing room. Organizes nodes "
-                            "within machines, machines within factories, factories within "
-                            "networks — each with appropriate spacing. Default: true."
-                        ),
-                        "default": True,
-                    },
-                    "spacing_level": {
-                        "type": "string",
-                        "enum": ["node", "container", "network"],
-                        "description": (
-                            "Spacing level for organize layout: "
-                            "'node' (tight: 60h/110v), "
-                            "'container' (medium: 150h/190v, default), "
-                            "'network' (spacious: 190h/250v)."
-                        ),
-                        "default": "container",
-                    },
-                    "orientation": {
-                        "type": "string",
-                        "enum": ["horizontal", "vertical"],
-                        "description": (
-                            "Layout direction: 'horizontal' (left→right, default) "
-                            "or 'vertical' (top→bottom tree). Applied at all hierarchy levels."
-                        ),
-                        "default": "horizontal",
-                    },
+    ``render`` is a bound ``CanvasRenderer`` render method.  Layout,
+    rasterization and PNG encoding are CPU-bound and would otherwise block
+    the stdio event loop for the whole render.
+    """
+    await asyncio.to_thread(render, canvas, return_bytes=False, **kwargs)
+
+
+# --- Parsed recipe cache ---
+# The same recipe is often re-rendered with different scale/layout options.
+# Parsed canvases are kept by a digest of the YAML text; the renderer moves
+# nodes in place, so every caller gets its own deep copy.
+_PARSE_CACHE_SIZE = 128
+_parse_cache: dict[bytes, Canvas] = {}
+
+
+def _recipe_key(yaml_str: str) -> bytes:
+    """Digest identifying a YAML recipe in the parse and layout caches."""
+    return hashlib.blake2b(yaml_str.encode(), digest_size=16).digest()
+
+
+def _parse_yaml_cached(key: bytes, yaml_str: str) -> Canvas:
+    """Parse a YAML recipe, reusing the result of an identical earlier recipe."""
+    canvas = _parse_cache.get(key)
+    if canvas is None:
+        canvas = parse_yaml(yaml_str)
+        if len(_parse_cache) >= _PARSE_CACHE_SIZE:
+            # Evict the oldest entry (dicts preserve insertion order)
+            del _parse_cache[next(iter(_parse_cache))]
+        _parse_cache[key] = canvas
+    # copy.deepcopy (unlike model_copy) keeps _node_map pointing at the
+    # copied nodes
+    return copy.deepcopy(canvas)
+
+
+# --- Layout cache ---
+# Laying out a canvas (organize or the fallback auto-layout) is the costly
+# part of a render and depends only on the recipe and the layout options,
+# scale included since node sizes follow the scaled font metrics.  The
+# resulting node positions are kept, in all_nodes() order, so re-rendering
+# the same recipe with the same options skips straight to drawing.
+_LAYOUT_CACHE_SIZE = 128
+_layout_cache: dict[tuple, tuple[tuple[float, float], ...]] = {}
+
+
+def _store_layout(key: tuple, canvas: Canvas) -> None:
+    """Remember the node positions of a freshly laid-out canvas."""
+    if len(_layout_cache) >= _LAYOUT_CACHE_SIZE:
+        del _layout_cache[next(iter(_layout_cache))]
+    _layout_cache[key] = tuple((n.x, n.y) for n in canvas.all_nodes())
+
+
+# --- Tool definitions ---
+# The tool schemas are constant, so they are built once at import and
+# list_tools hands back the same list on every request.  They are
+# hand-written and known valid, so model_construct skips validation.
+
+_TOOLS: list[Tool] = [
+    Tool.model_construct(
+        name="render_canvas",
+        description=(
+            "Render a canvas diagram from a YAML recipe string. "
+            "Supports hierarchical format (networks/factories/machines/nodes) "
+            "or a simplified format (flat list of nodes with inputs/outputs). "
+            "Returns the path to the rendered PNG file."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "yaml_recipe": {
+                    "type": "string",
+                    "description": (
+                        "YAML string defining the canvas. Simplified format example:\n"
+                        "title: My Diagram\n"
+                        "nodes:\n"
+                        "  - id: start\n"
+                        "    type: input\n"
+                        "    content: 'Begin here'\n"
+                        "  - id: process\n"
+                        "    type: process\n"
+                        "    content: 'Do work'\n"
+                        "    inputs: [start]\n"
+                        "\n"
+                        "Node types: static, input, ai, source, output, decision, process, default\n"
+                        "Coordinates (x, y) are optional — auto-layout is applied if all are 0."
+                    ),
+                },
+                "scale": {
+                    "type": "number",
+                    "description": "Render scale factor (default 2.0 for crisp, legible output)",
+                    "default": 2.0,
+                },
+                "filename": {
+                    "type": "string",
+                    "description": "Output filename (without extension). Default: auto-generated UUID.",
+                },
+                "organize": {
+                    "type": "boolean",
+                    "description": (
+                        "Apply the hierarchical organize algorithm for "
+                        "automatic layout with proper breathing room. Organizes nodes "
+                        "within machines, machines within factories, factories within "
+                        "networks — each with appropriate spacing. Default: true."
+                    ),
+                    "default": True,
+                },
+                "spacing_level": {
+                    "type": "string",
+                    "enum": ["node", "container", "network"],
+                    "description": (
+                        "Spacing level for organize layout: "
+                        "'node' (tight: 60h/110v), "
+                        "'container' (medium: 150h/190v, default), "
+                        "'network' (spacious: 190h/250v)."
+                    ),
+                    "default": "container",
+                },
+                "orientation": {
+                    "type": "string",
+                    "enum": ["horizontal", "vertical"],
+                    "description": (
+                        "Layout direction: 'horizontal' (left→right, default) "
+                        "or 'vertical' (top→bottom tree). Applied at all hierarchy levels."
+                    ),
+                    "default": "horizontal",
                 },
-                "required": ["yaml_recipe"],
             },
+            "required": ["yaml_recipe"],
+        },
+    ),
+    Tool.model_construct(
+        name="create_canvas",
+        description=(
+            "Create a canvas diagram from a structured description. "
+            "Provide a title, nodes, and connections — the tool handles layout and rendering. "
+            "Returns the path to the rendered PNG and the generated YAML recipe."
         ),
-        Tool(
-            name="create_canvas",
-            description=(
-                "Create a canvas diagram from a structured description. "
-                "Provide a title, nodes, and connections — the tool handles layout and rendering. "
-                "Returns the path to the rendered PNG and the generated YAML recipe."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "title": {
-                        "type": "string",
-                        "description": "Title for the canvas diagram.",
-                    },
-                    "nodes": {
-                        "type": "array",
-                        "description": "List of nodes to place on the canvas.",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "id": {"type": "string", "description": "Unique node identifier"},
-                                "type": {
-                                    "type": "string",
-                                    "enum": ["static", "input", "ai", "source", "output", "decision", "process", "default"],
-                                    "description": "Node type (affects color/styling)",
-                                },
-                                "content": {"type": "string", "description": "Text content of the node"},
-                                "label": {"type": "string", "description": "Display label (defaults to id)"},
-                                "inputs": {
-                                    "type": "array",
-                                    "items": {"type": "string"},
-                                    "description": "IDs of nodes that feed into this one",
-                                },
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "title": {
+                    "type": "string",
+                    "description": "Title for the canvas diagram.",
+                },
+                "nodes": {
+                    "type": "array",
+                    "description": "List of nodes to place on the canvas.",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string", "description": "Unique node identifier"},
+                            "type": {
+                                "type": "string",
+                                "enum": ["static", "input", "ai", "source", "output", "decision", "process", "default"],
+                                "description": "Node type (affects color/styling)",
+                            },
+                            "content": {"type": "string", "description": "Text content of the node"},
+                            "label": {"type": "string", "description": "Display label (defaults to id)"},
+                            "inputs": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "IDs of nodes that feed into this one",
                             },
-                            "required": ["id", "type", "content"],
                         },
+                        "required": ["id", "type", "content"],
                     },
-                    "machines": {
-                        "type": "array",
-                        "description": "Optional: group nodes into machines. Each item is a list of node IDs.",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "id": {"type": "string"},
-                                "label": {"type": "string"},
-                                "node_ids": {
-                                    "type": "array",
-                                    "items": {"type": "string"},
-                                },
+                },
+                "machines": {
+                    "type": "array",
+                    "description": "Optional: group nodes into machines. Each item is a list of node IDs.",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string"},
+                            "label": {"type": "string"},
+                            "node_ids": {
+                                "type": "array",
+                                "items": {"type": "string"},
                             },
-                            "required": ["id", "node_ids"],
                         },
-                    },
-                    "scale": {
-                        "type": "number",
-                        "description": "Render scale factor (default 2.0)",
-                        "default": 2.0,
-                    },
-                    "organize": {
-                        "type": "boolean",
-                        "description": (
-                            "Apply the organize algorithm for automatic layout. Default: true."
-                        ),
-                        "default": True,
-                    },
-                    "spacing_level": {
-                        "type": "string",
-                        "enum": ["node", "container", "network"],
-                        "description": "Spacing level for organize layout. Default: 'container'.",
-                        "default": "container",
-                    },
-                    "orientation": {
-                        "type": "string",
-                        "enum": ["horizontal", "vertical"],
-                        "description": (
-                            "Layout direction: 'horizontal' (left→right, default) "
-                            "or 'vertical' (top→bottom tree)."
-                        ),
-                        "default": "horizontal",
+                        "required": ["id", "node_ids"],
                     },
                 },
-                "required": ["title", "nodes"],
-            },
-        ),
-        Tool(
-            name="list_templates",
-            description="List available canvas recipe templates that can be used as starting points.",
-            inputSchema={
-                "type": "object",
-                "properties": {},
+                "scale": {
+                    "type": "number",
+                    "description": "Render scale factor (default 2.0)",
+                    "default": 2.0,
+                },
+                "organize": {
+                    "type": "boolean",
+                    "description": (
+                        "Apply the organize algorithm for automatic layout. Default: true."
+                    ),
+                    "default": True,
+                },
+                "spacing_level": {
+                    "type": "string",
+                    "enum": ["node", "container", "network"],
+                    "description": "Spacing level for organize layout. Default: 'container'.",
+                    "default": "container",
+                },
+                "orientation": {
+                    "type": "string",
+                    "enum": ["horizontal", "vertical"],
+                    "description": (
+                        "Layout direction: 'horizontal' (left→right, default) "
+                        "or 'vertical' (top→bottom tree)."
+                    ),
+                    "default": "horizontal",
+                },
             },
-        ),
-        Tool(
-            name="get_template",
-            description="Get the YAML content of a specific template by name.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "Template name (from list_templates output)",
-                    },
+            "required": ["title", "nodes"],
+        },
+    ),
+    Tool.model_construct(
+        name="list_templates",
+        description="List available canvas recipe templates that can be used as starting points.",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+        },
+    ),
+    Tool.model_construct(
+        name="get_template",
+        description="Get the YAML content of a specific template by name.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "Template name (from list_templates output)",
                 },
-                "required": ["name"],
             },
-        ),
-    ]
+            "required": ["name"],
+        },
+    ),
+]
+
+
+@server.list_tools()
+async def list_tools() -> list[Tool]:
+    return _TOOLS
 
 
 @server.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent | ImageContent]:
-    if name == "render_canvas":
-        return await _render_canvas(arguments)
-    elif name == "create_canvas":
-        return await _create_canvas(arguments)
-    elif name == "list_templates":
-        return await _list_templates(arguments)
-    elif name == "get_template":
-        return await _get_template(arguments)
-    else:
+    handler = _TOOL_HANDLERS.get(name)
+    if handler is None:
         return [TextContent(type="text", text=f"Unknown tool: {name}")]
+    return await handler(arguments)
 
 
 async def _render_canvas(args: dict) -> list[TextContent]:
@@ -233,10 +304,11 @@ async def _render_canvas(args: dict) -> list[TextContent]:
 
     yaml_str = args["yaml_recipe"]
     scale = args.get("scale", 2.0)
-    filename = args.get("filename", str(uuid.uuid4())[:8])
+    filename = args.get("filename") or os.urandom(4).hex()
 
+    recipe_key = _recipe_key(yaml_str)
     try:
-        canvas = parse_yaml(yaml_str)
+        canvas = _parse_yaml_cached(recipe_key, yaml_str)
     except Exception as e:
         return [TextContent(type="text", text=f"Failed to parse YAML recipe: {e}")]
 
@@ -247,25 +319,44 @@ async def _render_canvas(args: dict) -> list[TextContent]:
     renderer = CanvasRenderer(scale=scale)
     output_path = str(OUTPUT_DIR / f"{filename}.png")
 
+    layout_key = (recipe_key, scale, organize, spacing_level, orientation)
+    positions = _layout_cache.get(layout_key)
+
     try:
-        renderer.render(
-            canvas,
-            output_path=output_path,
-            organize=organize,
-            spacing_level=spacing_level,
-            orientation=orientation,
-        )
+        if positions is not None:
+            # Laid out before with the same options: reuse the positions
+            for node, (x, y) in zip(canvas.all_nodes(), positions):
+                node.x = x
+                node.y = y
+            await _render_off_loop(
+                renderer.render_prepositioned, canvas, output_path=output_path,
+            )
+        elif not organize and any(n.x or n.y for n in canvas.all_nodes()):
+            # The recipe carries its own coordinates: skip the layout step
+            await _render_off_loop(
+                renderer.render_prepositioned, canvas, output_path=output_path,
+            )
+        else:
+            await _render_off_loop(
+                renderer.render,
+                canvas,
+                output_path=output_path,
+                organize=organize,
+                spacing_level=spacing_level,
+                orientation=orientation,
+            )
+            _store_layout(layout_key, canvas)
     except Exception as e:
         return [TextContent(type="text", text=f"Rendering failed: {e}")]
 
     return [TextContent(
         type="text",
-        text=json.dumps({
+        text=_dumps({
             "status": "success",
             "path": output_path,
             "title": canvas.title,
-            "nodes": len(canvas.all_nodes()),
-            "connections": len(canvas.all_connections()),
+            "nodes": canvas.node_count(),
+            "connections": canvas.connection_count(),
             "organized": organize,
             "spacing_level": spacing_level if organize else None,
             "orientation": orientation if organize else None,
@@ -309,9 +400,10 @@ async def _create_canvas(args: dict) -> list[TextContent]:
                 label=md.get("label"),
                 nodes=m_nodes,
             ))
-        # Put unassigned nodes in a catch-all machine
-        unassigned = [n for nid, n in nodes_by_id.items() if nid not in assigned]
-        if unassigned:
+        # Put unassigned nodes in a catch-all machine (kept in input order)
+        unassigned_ids = nodes_by_id.keys() - assigned
+        if unassigned_ids:
+            unassigned = [n for nid, n in nodes_by_id.items() if nid in unassigned_ids]
             machines.append(CanvasMachine(id="machine-unassigned", nodes=unassigned))
     else:
         # Auto-detect machines from connectivity
@@ -324,11 +416,12 @@ async def _create_canvas(args: dict) -> list[TextContent]:
 
     # Render
     renderer = CanvasRenderer(scale=scale)
-    filename = title.lower().replace(" ", "-")[:30] + "-" + str(uuid.uuid4())[:4]
+    filename = f"{title.lower().translate(_FILENAME_TABLE)[:30]}-{os.urandom(2).hex()}"
     output_path = str(OUTPUT_DIR / f"{filename}.png")
 
     try:
-        renderer.render(
+        await _render_off_loop(
+            renderer.render,
             canvas,
             output_path=output_path,
             organize=organize,
@@ -340,87 +433,176 @@ async def _create_canvas(args: dict) -> list[TextContent]:
 
     # Also save the YAML recipe
     yaml_path = str(OUTPUT_DIR / f"{filename}.yaml")
-    yaml_content = canvas_to_yaml(canvas)
-    Path(yaml_path).write_text(yaml_content)
+    with open(yaml_path, "w") as fp:
+        canvas_to_yaml_stream(canvas, fp)
 
     return [TextContent(
         type="text",
-        text=json.dumps({
+        text=_dumps({
             "status": "success",
             "png_path": output_path,
             "yaml_path": yaml_path,
             "title": title,
-            "nodes": len(canvas.all_nodes()),
-            "connections": len(canvas.all_connections()),
+            "nodes": canvas.node_count(),
+            "connections": canvas.connection_count(),
             "machines": len(machines),
         }),
     )]
 
 
+def _component_labels(n: int, edges: list[tuple[int, int]]) -> list[int]:
+    """Label each of ``n`` vertices with the id of its connected component.
+
+    ``edges`` are undirected (i, j) vertex-index pairs.  Union-find keeps
+    the lowest index of each component as its root, so components are
+    labelled 0, 1, ... in order of their first vertex.
+    """
+    parent = list(range(n))
+    for i, j in edges:
+        # Find both roots, halving the paths as we go
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        while parent[j] != j:
+            parent[j] = parent[parent[j]]
+            j = parent[j]
+        if i < j:
+            parent[j] = i
+        elif j < i:
+            parent[i] = j
+
+    labels = [0] * n
+    next_label = 0
+    for v in range(n):
+        root = parent[v]
+        while parent[root] != root:
+            root = parent[root]
+        if root == v:
+            labels[v] = next_label
+            next_label += 1
+        else:
+            # The root has a lower index, so it is already labelled
+            labels[v] = labels[root]
+    return labels
+
+
 def _auto_detect_machines(nodes: list[CanvasNode]) -> list[CanvasMachine]:
-    """Auto-detect machines as connected components of nodes."""
+    """Auto-detect machines as connected components of nodes.
+
+    Node ids are mapped to integer indices once, and the traversal runs
+    on plain index pairs.  Machines are numbered by the position of their
+    first node and keep nodes in input order, so the grouping is
+    deterministic.
+    """
     if not nodes:
         return []
 
-    # Build adjacency from inputs/outputs
-    adj: dict[str, set[str]] = {n.id: set() for n in nodes}
-    node_ids = {n.id for n in nodes}
-
-    for n in nodes:
-        for inp in n.inputs:
-            if inp in node_ids:
-                adj[n.id].add(inp)
-                adj[inp].add(n.id)
-        for out in n.outputs:
-            if out in node_ids:
-                adj[n.id].add(out)
-                adj[out].add(n.id)
-
-    # Find connected components
-    visited = set()
-    components = []
-
-    for n in nodes:
-        if n.id in visited:
-            continue
-        component = []
-        stack = [n.id]
-        while stack:
-            nid = stack.pop()
-            if nid in visited:
-                continue
-            visited.add(nid)
-            component.append(nid)
-            stack.extend(adj[nid] - visited)
-        components.append(component)
+    # Graph build: node ids -> indices, connections -> index pairs.
+    # One dict probe per endpoint; dangling ids are dropped.
+    index = {n.id: i for i, n in enumerate(nodes)}
+    get_index = index.get
+    edges = [
+        (i, j)
+        for i, n in enumerate(nodes)
+        for ids in (n.inputs, n.outputs)
+        for other in ids
+        if (j := get_index(other)) is not None
+    ]
 
-    # Create machines
-    nodes_by_id = {n.id: n for n in nodes}
-    machines = []
-    for i, comp in enumerate(components):
-        m_nodes = [nodes_by_id[nid] for nid in comp]
-        machines.append(CanvasMachine(
-            id=f"machine-{i+1}",
-            nodes=m_nodes,
-        ))
+    labels = _component_labels(len(nodes), edges)
+
+    # Group nodes by component, in input order
+    components: list[list[CanvasNode]] = [[] for _ in range(max(labels) + 1)]
+    for node, label in zip(nodes, labels):
+        components[label].append(node)
 
-    return machines
+    # Create machines
+    return [
+        CanvasMachine(id=f"machine-{i+1}", nodes=m_nodes)
+        for i, m_nodes in enumerate(components)
+    ]
 
 
-async def _list_templates(args: dict) -> list[TextContent]:
-    """List available template files."""
-    templates = []
+def _template_paths() -> dict[str, Path]:
+    """Template files in TEMPLATES_DIR keyed by name (file stem), glob only.
 
+    A ``.yaml`` file takes precedence over a ``.yml`` file with the same stem.
+    """
+    paths: dict[str, Path] = {}
     if TEMPLATES_DIR.exists():
         for f in sorted(TEMPLATES_DIR.glob("*.yaml")) + sorted(TEMPLATES_DIR.glob("*.yml")):
-            templates.append({
-                "name": f.stem,
-                "path": str(f),
-            })
+            paths.setdefault(f.stem, f)
+    return paths
+
+
+def _find_template(name: str) -> Path | None:
+    """Path of the template called ``name``, trying .yaml then .yml."""
+    for ext in (".yaml", ".yml"):
+        path = TEMPLATES_DIR / f"{name}{ext}"
+        if path.is_file():
+            return path
+    return None
+
+
+@lru_cache(maxsize=1)
+def _bundled_templates() -> dict[str, tuple[Path, str]]:
+    """Read the bundled templates once per process, as ``name -> (path, text)``.
+
+    They never change while the server runs, so both template tools are
+    answered from memory.  A file that can't be read or decoded is left
+    out rather than failing every lookup.
+    """
+    templates: dict[str, tuple[Path, str]] = {}
+    for name, path in _template_paths().items():
+        try:
+            templates[name] = (path, path.read_text())
+        except (OSError, UnicodeDecodeError):
+            continue
+    return templates
+
+
+@lru_cache(maxsize=1)
+def _bundled_template_list() -> tuple[dict, ...]:
+    """The list_templates entries for the bundled templates, built once.
+
+    Titles come from the text already held by ``_bundled_templates``.
+    """
+    templates = []
+    for name, (path, text) in _bundled_templates().items():
+        try:
+            title = parse_header_text(text).get("title")
+        except ValueError:
+            title = None
+        templates.append({"name": name, "title": title, "path": str(path)})
+    return tuple(templates)
+
+
+def _templates_overridden() -> bool:
+    """Whether templates come from a CANVAS_TEMPLATES_DIR override.
+
+    An override directory may be edited while the server runs, so it is
+    looked up on each call (one glob to list, one file read to fetch)
+    instead of being cached.
+    """
+    return "CANVAS_TEMPLATES_DIR" in os.environ
+
+
+async def _list_templates(args: dict) -> list[TextContent]:
+    """List available template files with their titles."""
+    if not _templates_overridden():
+        templates = list(_bundled_template_list())
+    else:
+        templates = []
+        for name, path in _template_paths().items():
+            try:
+                title = parse_header(str(path)).get("title")
+            except (OSError, ValueError):
+                title = None
+            templates.append({"name": name, "title": title, "path": str(path)})
 
     return [TextContent(
         type="text",
-        text=json.dumps({"templates": templates}),
+        text=_dumps({"templates": templates}),
     )]
 
 
@@ -428,18 +610,29 @@ async def _get_template(args: dict) -> list[TextContent]:
     """Get template content by name."""
     name = args["name"]
 
-    # Check local templates first
-    for ext in [".yaml", ".yml"]:
-        path = TEMPLATES_DIR / f"{name}{ext}"
-        if path.exists():
+    if _templates_overridden():
+        path = _find_template(name)
+        if path is not None:
             return [TextContent(type="text", text=path.read_text())]
+    else:
+        template = _bundled_templates().get(name)
+        if template:
+            return [TextContent(type="text", text=template[1])]
 
     return [TextContent(type="text", text=f"Template not found: {name}")]
 
 
+# Tool name -> handler, used by call_tool
+_TOOL_HANDLERS: dict[str, Callable[[dict], Awaitable[list[TextContent]]]] = {
+    "render_canvas": _render_canvas,
+    "create_canvas": _create_canvas,
+    "list_templates": _list_templates,
+    "get_template": _get_template,
+}
+
+
 def main():
     """Entry point for the MCP server."""
-    import asyncio
     asyncio.run(_run())
 
 
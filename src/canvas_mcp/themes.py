@@ -10,13 +10,18 @@ Each theme defines colors for:
 """
 
 from __future__ import annotations
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, fields
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ThemePalette:
-    """Color palette for a theme."""
+    """Color palette for a theme.
+
+    Palettes are shared module-level constants read on every node and
+    connection, so they are immutable and slotted.
+    """
 
     # Canvas
     background: str
@@ -45,6 +50,14 @@ class ThemePalette:
     # Connection color (base - will be adjusted per source type)
     connection_base: str
 
+    def __post_init__(self):
+        # Intern color strings so equal colors share one object and
+        # comparisons between them short-circuit on identity.
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, str):
+                object.__setattr__(self, f.name, sys.intern(value))
+
 
 # Catppuccin Mocha (dark theme) - current default
 DARK_THEME = ThemePalette(
@@ -105,7 +118,13 @@ def get_theme(name: str) -> ThemePalette:
     Raises:
         ValueError: If theme name is not recognized
     """
-    if name not in THEMES:
+    # The two built-in names are checked directly; THEMES covers the rest.
+    if name == "dark":
+        return DARK_THEME
+    if name == "light":
+        return LIGHT_THEME
+    theme = THEMES.get(name)
+    if theme is None:
         valid = ", ".join(THEMES.keys())
         raise ValueError(f"Unknown theme '{name}'. Valid themes: {valid}")
-    return THEMES[name]
+    return theme
@@ -1,63 +1,141 @@
-"""Quick test to verify Canvas-MCP rendering works."""
+"""Quick test to verify Canvas-MCP rendering works.
 
+The renders are independent, so they run concurrently in a thread pool.
+Pillow releases the GIL while encoding, and threads avoid the start-up and
+pickling cost of worker processes.  Pass ``--processes`` to use a process
+pool instead (for when the Python-side layout dominates on a many-core
+box), or ``--serial`` to run them one after another.
+"""
+
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from canvas_mcp.parser import parse_yaml, parse_file
+from canvas_mcp.parser import parse_dict, parse_file
 from canvas_mcp.renderer import CanvasRenderer
 
+OUTPUT_DIR = Path("/home/bobbyhiddn/Code/Canvas-MCP/output")
+TEMPLATES_DIR = Path("/home/bobbyhiddn/Code/Canvas-MCP/templates")
+
 # Test 1: Simple format (auto-layout)
-simple_yaml = """
-title: Test Canvas
-nodes:
-  - id: start
-    type: input
-    content: "User request comes in"
-    label: Request
-    outputs: [process]
-  - id: process
-    type: process
-    content: "Validate and transform data"
-    label: Transform
-    inputs: [start]
-    outputs: [ai-step]
-  - id: ai-step
-    type: ai
-    content: "LLM processes the request"
-    label: AI Analysis
-    inputs: [process]
-    outputs: [result]
-  - id: result
-    type: output
-    content: "Return formatted response"
-    label: Response
-    inputs: [ai-step]
-"""
+SIMPLE_CANVAS = {
+    "title": "Test Canvas",
+    "nodes": [
+        {
+            "id": "start",
+            "type": "input",
+            "content": "User request comes in",
+            "label": "Request",
+            "outputs": ["process"],
+        },
+        {
+            "id": "process",
+            "type": "process",
+            "content": "Validate and transform data",
+            "label": "Transform",
+            "inputs": ["start"],
+            "outputs": ["ai-step"],
+        },
+        {
+            "id": "ai-step",
+            "type": "ai",
+            "content": "LLM processes the request",
+            "label": "AI Analysis",
+            "inputs": ["process"],
+            "outputs": ["result"],
+        },
+        {
+            "id": "result",
+            "type": "output",
+            "content": "Return formatted response",
+            "label": "Response",
+            "inputs": ["ai-step"],
+        },
+    ],
+}
+
+# (name, recipe dict or template Path, output Path, organize, optional)
+# Optional tests report [SKIP] instead of failing the run.
+TESTS = [
+    (
+        "Simple flow",
+        SIMPLE_CANVAS,
+        OUTPUT_DIR / "test-simple.png",
+        False,
+        False,
+    ),
+    # Test 2: AI Pipeline template (explicit coordinates)
+    (
+        "AI Pipeline",
+        TEMPLATES_DIR / "ai-pipeline.yaml",
+        OUTPUT_DIR / "test-pipeline.png",
+        False,
+        False,
+    ),
+    # Test 3: Decision tree template (auto-layout)
+    (
+        "Decision tree",
+        TEMPLATES_DIR / "decision-tree.yaml",
+        OUTPUT_DIR / "test-decision.png",
+        False,
+        False,
+    ),
+    # Test 4: Full hierarchical format (via ai-pipeline template)
+    (
+        "Hierarchical pipeline",
+        TEMPLATES_DIR / "ai-pipeline.yaml",
+        OUTPUT_DIR / "test-hierarchical.png",
+        True,
+        True,
+    ),
+]
+
+
+def run_test(name: str, source: dict | Path, output: Path, organize: bool = False) -> str:
+    """Render one canvas and return its [OK] line.
+
+    Each call builds its own renderer so tests can run in worker processes.
+    """
+    canvas = parse_file(str(source)) if isinstance(source, Path) else parse_dict(source)
+    renderer = CanvasRenderer(scale=2.0)
+    # Fast zlib level: these renders are checked by eye, not shipped
+    image = renderer.render(canvas, output_path=str(output), organize=organize, compress_level=1)
+    return f"[OK] {name} rendered: {output} ({len(image)} bytes)"
+
+
+def main(mode: str = "threads") -> None:
+    """Run all tests; ``mode`` is "threads", "processes" or "serial"."""
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    if mode != "serial":
+        executor = ProcessPoolExecutor if mode == "processes" else ThreadPoolExecutor
+        with executor(max_workers=len(TESTS)) as pool:
+            futures = {
+                pool.submit(run_test, name, source, output, organize): (name, optional)
+                for name, source, output, organize, optional in TESTS
+            }
+            for future in as_completed(futures):
+                name, optional = futures[future]
+                _report(name, optional, future.result)
+    else:
+        for name, source, output, organize, optional in TESTS:
+            _report(name, optional, lambda: run_test(name, source, output, organize))
+
+    print("\nAll tests passed!")
+
+
+def _report(name: str, optional: bool, result) -> None:
+    """Print a test's status line; failures only pass for optional tests."""
+    try:
+        print(result())
+    except Exception as e:
+        if not optional:
+            raise
+        print(f"[SKIP] {name}: {e}")
+
 
-canvas = parse_yaml(simple_yaml)
-renderer = CanvasRenderer(scale=2.0)
-output = Path("/home/bobbyhiddn/Code/Canvas-MCP/output/test-simple.png")
-output.parent.mkdir(exist_ok=True)
-renderer.render(canvas, output_path=str(output))
-print(f"[OK] Simple flow rendered: {output} ({output.stat().st_size} bytes)")
-
-# Test 2: AI Pipeline template (explicit coordinates)
-canvas2 = parse_file("/home/bobbyhiddn/Code/Canvas-MCP/templates/ai-pipeline.yaml")
-output2 = Path("/home/bobbyhiddn/Code/Canvas-MCP/output/test-pipeline.png")
-renderer.render(canvas2, output_path=str(output2))
-print(f"[OK] AI Pipeline rendered: {output2} ({output2.stat().st_size} bytes)")
-
-# Test 3: Decision tree template (auto-layout)
-canvas3 = parse_file("/home/bobbyhiddn/Code/Canvas-MCP/templates/decision-tree.yaml")
-output3 = Path("/home/bobbyhiddn/Code/Canvas-MCP/output/test-decision.png")
-renderer.render(canvas3, output_path=str(output3))
-print(f"[OK] Decision tree rendered: {output3} ({output3.stat().st_size} bytes)")
-
-# Test 4: Full hierarchical format (via ai-pipeline template)
-try:
-    canvas4 = parse_file("/home/bobbyhiddn/Code/Canvas-MCP/templates/ai-pipeline.yaml")
-    output4 = Path("/home/bobbyhiddn/Code/Canvas-MCP/output/test-hierarchical.png")
-    renderer.render(canvas4, output_path=str(output4), organize=True)
-    print(f"[OK] Hierarchical pipeline rendered: {output4} ({output4.stat().st_size} bytes)")
-except Exception as e:
-    print(f"[SKIP] Hierarchical pipeline: {e}")
-
-print("\nAll tests passed!")
+if __name__ == "__main__":
+    if "--serial" in sys.argv[1:]:
+        main("serial")
+    elif "--processes" in sys.argv[1:]:
+        main("processes")
+    else:
+        main()